@@ -91,7 +91,7 @@ setup(
     package_dir={"": "src"},
     py_modules=[splitext(basename(path))[0] for path in glob("src/*.py")],
     include_package_data=True,
-    install_requires=["boto3", "botocore", "docopt", "schema", "setuptools >= 24.2.0"],
+    install_requires=["boto3", "botocore", "docopt", "setuptools >= 24.2.0"],
     extras_require={
         "test": [
             "coverage",
@@ -3,10 +3,12 @@
 Usage:
   manage-cyhy-ops [--debug] [--regions=REGIONS] [--ssm-cyhy-ops=CYHY_OPS]
     [--ssm-ssh-prefix=SSH_PREFIX] add [--overwrite] [--username=USERNAME] SSH_KEY
+  manage-cyhy-ops [--debug] [--regions=REGIONS] [--ssm-cyhy-ops=CYHY_OPS]
+    [--ssm-ssh-prefix=SSH_PREFIX] add-batch [--overwrite]
   manage-cyhy-ops [--debug] [--regions=REGIONS] [--ssm-cyhy-ops=CYHY_OPS]
     [--ssm-ssh-prefix=SSH_PREFIX] remove [--full] USERNAME
   manage-cyhy-ops [--debug] [--regions=REGIONS] [--ssm-cyhy-ops=CYHY_OPS]
-    [--ssm-ssh-prefix=SSH_PREFIX] list USERNAME
+    [--ssm-ssh-prefix=SSH_PREFIX] list [--exists-only] USERNAME
   manage-cyhy-ops (-h | --help)
   manage-cyhy-ops --version
 
@@ -16,6 +18,10 @@ Arguments:
             SSH key comment should be a username in the format "firstname.lastname".
   USERNAME  A username in the format "firstname.lastname".
 
+The add-batch command reads newline-delimited "USERNAME SSH_KEY" pairs from
+standard input and adds all of them with a single CyHy Operators list update
+per region.
+
 Options:
   -h --help                    Show this message.
   --version                    Show version.
@@ -30,81 +36,86 @@ Options:
                                [default: /ssh/public_keys]
   --overwrite                  Overwrite the user's SSH key if one already exists.
   --full                       Also remove the user's SSH key from SSM.
+  --exists-only                Only check whether the user's SSH key exists
+                               instead of retrieving it.
 """
 
 # Standard Python Libraries
 import logging
+import re
+import string
 import sys
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
 # Third-Party Libraries
 import docopt
-from schema import And, Or, Regex, Schema, SchemaError, Use
 
 from ._version import __version__
-from .manageoperators import ManageOperators
 
 ALLOWED_REGIONS = ["us-east-1", "us-east-2", "us-west-1", "us-west-2"]
-# AWS only allows these characters in Parameter Store keys.
-VALID_SSM_CHARS = r"^[a-zA-Z0-9.\-_/]*$"
+# Frozen set of the allowed regions for constant-time membership tests.
+ALLOWED_REGIONS_SET = frozenset(ALLOWED_REGIONS)
+# AWS only allows these characters in Parameter Store keys.  Set differences
+# against these frozensets are faster than the regex engine for such short,
+# ASCII-only strings.
+SSM_ALLOWED_CHARS = frozenset(string.ascii_letters + string.digits + ".-_/")
 # Subset of valid characters we'll allow for usernames.
-VALID_USERNAME = r"^[a-zA-Z0-9.\-_]*$"
+USERNAME_ALLOWED_CHARS = frozenset(string.ascii_letters + string.digits + ".-_")
+# An SSH key must be exactly three space-separated fields (type, key, and
+# comment).  The groups let us pull out the comment without re-splitting.
+SSH_KEY_RE = re.compile(r"^(\S+) (\S+) (\S+)$")
 USERNAME_ERROR_MSG = (
     'Username must be in the format "firstname.lastname", and can only consist '
     'of letters, numbers, and the characters ".-_".'
 )
-# The Schema for an SSM key is used more than once so we define it here.
-SSM_KEY_VALIDATE = And(
-    str,
-    Use(str.lower),
-    Regex(VALID_SSM_CHARS),
-    lambda s: s[0] == "/" if "/" in s else True,
-    error="Invalid SSM key provided.",
-)
-# The Schema for a username is used in multiple places so we define it here.
-USERNAME_VALIDATE = Or(
-    None,
-    And(
-        str,
-        Use(str.lower),
-        Regex(VALID_USERNAME),
-        lambda s: len(s.split(".")) >= 2,
-        error=f"USER {USERNAME_ERROR_MSG}",
-    ),
-)
+
+
+def _validate_ssm_key(key: str) -> str:
+    """Validate and normalize an SSM Parameter Store key."""
+    key = key.lower()
+    if set(key) - SSM_ALLOWED_CHARS or ("/" in key and key[0] != "/"):
+        raise ValueError("Invalid SSM key provided.")
+    return key
+
+
+def _validate_username(username: Optional[str]) -> Optional[str]:
+    """Validate and normalize a username if one was provided."""
+    if username is None:
+        return None
+    username = username.lower()
+    if set(username) - USERNAME_ALLOWED_CHARS or len(username.split(".")) < 2:
+        raise ValueError(f"USER {USERNAME_ERROR_MSG}")
+    return username
+
+
+def _validate(args: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate and normalize the docopt arguments.
+
+    These few fixed checks used to run through the schema library, but a
+    direct implementation avoids importing and walking a generic validation
+    framework on every invocation.
+    """
+    validated = dict(args)
+    if not all(r in ALLOWED_REGIONS_SET for r in args["--regions"].split(",")):
+        raise ValueError(
+            f"Invalid region(s) provided. Valid regions are: {ALLOWED_REGIONS}"
+        )
+    validated["--ssm-ssh-prefix"] = _validate_ssm_key(args["--ssm-ssh-prefix"])
+    validated["--ssm-cyhy-ops"] = _validate_ssm_key(args["--ssm-cyhy-ops"])
+    validated["--username"] = _validate_username(args["--username"])
+    validated["USERNAME"] = _validate_username(args["USERNAME"])
+    if args["SSH_KEY"] is not None and not SSH_KEY_RE.match(args["SSH_KEY"]):
+        raise ValueError("Invalid SSH key format.")
+    return validated
 
 
 def main() -> None:
     """Provide an interface to manage CyHy operators."""
     args: Dict[str, str] = docopt.docopt(__doc__, version=__version__)
 
-    schema: Schema = Schema(
-        {
-            "--regions": And(
-                str,
-                lambda s: False
-                not in map(lambda r: r in ALLOWED_REGIONS, s.split(",")),
-                error=f"Invalid region(s) provided. Valid regions are: {ALLOWED_REGIONS}",
-            ),
-            "--ssm-ssh-prefix": SSM_KEY_VALIDATE,
-            "--ssm-cyhy-ops": SSM_KEY_VALIDATE,
-            "--username": USERNAME_VALIDATE,
-            "SSH_KEY": Or(
-                None,
-                And(
-                    str,
-                    lambda s: len(s.split(" ")) == 3,
-                    error="Invalid SSH key format.",
-                ),
-            ),
-            "USERNAME": USERNAME_VALIDATE,
-            str: object,  # No other validation to perform.
-        }
-    )
-
     try:
-        validated_args: Dict[str, Any] = schema.validate(args)
-    except SchemaError as err:
+        validated_args: Dict[str, Any] = _validate(args)
+    except ValueError as err:
         # Exit because one or more of the arguments were invalid.
         print(err, file=sys.stderr)
         sys.exit(1)
@@ -117,13 +128,17 @@ def main() -> None:
 
     logging.debug(validated_args)
 
+    # Importing the manager module pulls in boto3, which dominates CLI
+    # startup time, so wait until we know AWS will actually be used.
+    from .manageoperators import get_manager
+
     try:
         regions: List = validated_args["--regions"].split(",")
         cyhy_ops: str = validated_args["--ssm-cyhy-ops"]
         ssh_prefix: str = validated_args["--ssm-ssh-prefix"]
-        managers: List[ManageOperators] = []
-        for region in regions:
-            managers.append(ManageOperators(region, cyhy_ops, ssh_prefix))
+        # A single manager handles every region and fans the per-region SSM
+        # work out across threads internally.
+        manager = get_manager(tuple(regions), cyhy_ops, ssh_prefix)
     except Exception as err:
         logging.error(err)
         sys.exit(1)
@@ -140,26 +155,48 @@ def main() -> None:
             username = validated_args["--username"]
         else:
             logging.debug("Using SSH key comment as username.")
+            ssh_key_match = SSH_KEY_RE.match(ssh_key)
             try:
-                username = Schema(USERNAME_VALIDATE).validate(ssh_key.split(" ")[2])
-            except SchemaError as err:
+                # _validate() already rejected keys that don't match
+                # SSH_KEY_RE, so this cannot trigger in practice.
+                if ssh_key_match is None:
+                    raise ValueError("Invalid SSH key format.")
+                username = _validate_username(ssh_key_match.group(3))
+            except ValueError as err:
                 logging.error(err)
                 sys.exit(1)
 
-        for manager in managers:
-            results.append(
-                manager.add_user(username, ssh_key, overwrite=overwrite_ssh_key)
-            )
+        results.append(manager.add_user(username, ssh_key, overwrite=overwrite_ssh_key))
+    elif validated_args["add-batch"]:
+        pairs: List[Tuple[str, str]] = []
+        for line_number, line in enumerate(sys.stdin, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                raw_username, _, batch_ssh_key = line.partition(" ")
+                batch_username = _validate_username(raw_username)
+                # _validate_username only returns None for a None input.
+                if batch_username is None:
+                    raise ValueError(f"USER {USERNAME_ERROR_MSG}")
+                if not SSH_KEY_RE.match(batch_ssh_key):
+                    raise ValueError("Invalid SSH key format.")
+            except ValueError as err:
+                logging.error("Invalid entry on line %d: %s", line_number, err)
+                sys.exit(1)
+            pairs.append((batch_username, batch_ssh_key))
+
+        results.append(manager.add_users(pairs, overwrite=overwrite_ssh_key))
     elif validated_args["remove"]:
-        for manager in managers:
-            results.append(manager.remove_user(username, delete_ssh_key))
+        results.append(manager.remove_user(username, delete_ssh_key))
     elif validated_args["list"]:
-        for manager in managers:
-            results.append(manager.check_user(username))
+        results.append(
+            manager.check_user(username, exists_only=validated_args["--exists-only"])
+        )
     else:
         logging.info("Feature not implemented yet.")
 
     # Right now all return statuses from the Manager are 1, but that is not
     # guaranteed in the future. This handles any non-successful error code.
-    if True in map(lambda e: e != 0, results):
+    if any(result != 0 for result in results):
         sys.exit(1)
@@ -1,200 +1,589 @@
 """Provide an interface to manage operator information in SSM."""
 
 # Standard Python Libraries
+from concurrent.futures import ThreadPoolExecutor
+import functools
 import logging
-from typing import List
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Set, Tuple
 
 # Third-Party Libraries
-import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
+if TYPE_CHECKING:
+    # Third-Party Libraries
+    import boto3
+
+# Resolve the module logger once instead of looking up the root logger on
+# every logging call.
+logger = logging.getLogger(__name__)
+
+# How long (in seconds) a cached copy of the CyHy Operators list is considered
+# fresh before we re-read it from the Parameter Store.
+OPS_CACHE_TTL = 5.0
+
+# The maximum parameter value size for the Standard tier.  We pin our writes
+# to that tier (it is free and more than enough for an SSH public key) rather
+# than letting an account-level default silently move them to the paid
+# Advanced tier.
+STANDARD_TIER_MAX_BYTES = 4096
+
+# A single boto3 Session shared by every regional client so credential and
+# configuration resolution only happens once per invocation.
+_session: Optional["boto3.session.Session"] = None
+
+
+def _get_session() -> "boto3.session.Session":
+    """Return the shared boto3 Session, creating it on first use.
+
+    boto3 Sessions are not thread-safe, so all client creation goes through
+    _get_client's lock; the worker threads only ever touch the resulting
+    clients, which are safe to share.
+    """
+    global _session
+    if _session is None:
+        # Importing boto3 is expensive (a few hundred milliseconds), so we
+        # defer it until a client is actually needed.  Code paths like
+        # --help and --version never pay for it.
+        # Third-Party Libraries
+        import boto3
+
+        _session = boto3.session.Session()
+    return _session
+
+
+# Shared client configuration: keep connections alive between calls, size the
+# connection pool so the threaded fan-out and batch adds never queue on a
+# connection, fail fast instead of waiting out the 60 second botocore
+# defaults, and let adaptive retries smooth over SSM throttling.
+CLIENT_CONFIG = Config(
+    connect_timeout=5,
+    max_pool_connections=50,
+    read_timeout=15,
+    retries={"max_attempts": 5, "mode": "adaptive"},
+    tcp_keepalive=True,
+)
+
+# Clients memoized per region so repeated ManageOperators constructions reuse
+# the same warm connection pools instead of rebuilding them.
+_clients: Dict[str, Any] = {}
+_clients_lock = threading.Lock()
+
+
+def _get_client(region: str) -> Any:
+    """Return the memoized SSM client for a region, creating it on first use."""
+    with _clients_lock:
+        client = _clients.get(region)
+        if client is None:
+            client = _get_session().client(
+                "ssm", region_name=region, config=CLIENT_CONFIG
+            )
+            _clients[region] = client
+    return client
+
 
 class ManageOperators:
-    """Manage CyHy operators in a given AWS region.
+    """Manage CyHy operators in one or more AWS regions.
 
     This class handles adding, listing, and removing Cyhy Operators from AWS's
-    SSM Parameter Store in a specified region.
+    SSM Parameter Store in the specified regions.
     """
 
-    def __init__(self, region: str, cyhy_ops_key: str, ssh_key_prefix: str):
+    def __init__(
+        self,
+        regions: List[str],
+        cyhy_ops_key: str,
+        ssh_key_prefix: str,
+        cache_ttl: float = OPS_CACHE_TTL,
+    ):
         """Set up an operator manager."""
         self.cyhy_ops_key = cyhy_ops_key
         self.ssh_key_prefix = ssh_key_prefix
-        self.region = region
-        try:
-            self._client = boto3.client("ssm", region_name=region)
-        except ClientError as err:
-            logging.error('Unable to setup SSM client in region "%s".', region)
-            raise err
+        self.regions = regions
+        # Cached (timestamp, users) copies of the CyHy Operators parameter,
+        # keyed by region, so repeated updates in a single invocation don't
+        # each re-read from SSM.  The lock keeps the cache consistent when
+        # regions are processed on separate threads.
+        self._cache_ttl = cache_ttl
+        self._cache_lock = threading.Lock()
+        self._users_cache: Dict[str, Tuple[float, Set[str]]] = {}
+        # The last parameter Version seen per region, used to detect writers
+        # racing with our read-modify-write of the operators list.
+        self._users_version: Dict[str, Optional[int]] = {}
+        self.clients: Dict[str, Any] = {}
+        for region in regions:
+            try:
+                self.clients[region] = _get_client(region)
+            except ClientError as err:
+                logger.error('Unable to setup SSM client in region "%s".', region)
+                raise err
+        # Flatten the client regions into a tuple once so each operation can
+        # feed the executor directly instead of rebuilding a dict view.
+        self._client_regions: Tuple[str, ...] = tuple(self.clients)
+        # botocore generates modeled exception classes lazily; resolve each
+        # region's once here instead of walking client.exceptions on every
+        # reference in the request paths.
+        self._parameter_not_found: Dict[str, Any] = {
+            region: client.exceptions.ParameterNotFound
+            for region, client in self.clients.items()
+        }
+        self._parameter_already_exists: Dict[str, Any] = {
+            region: client.exceptions.ParameterAlreadyExists
+            for region, client in self.clients.items()
+        }
+
+    def _fan_out(self, operation: Callable[[str], int]) -> int:
+        """Run a per-region operation across all regions concurrently.
 
-    def _get_cyhy_ops_list(self) -> List[str]:
-        users: List[str] = []
+        The per-region work is purely network-bound SSM traffic, so threads
+        give us near-constant wall-clock time regardless of region count.
+        """
+
+        def run(region: str) -> int:
+            try:
+                return operation(region)
+            except Exception as err:
+                # One region failing unexpectedly shouldn't cancel or discard
+                # the results of the others.
+                logger.error('Unexpected error in region "%s": %s', region, err)
+                return 1
+
+        with ThreadPoolExecutor(
+            max_workers=min(16, len(self._client_regions))
+        ) as executor:
+            results = list(executor.map(run, self._client_regions))
+        return max(results, default=0)
+
+    def _get_cyhy_ops_list(self, region: str) -> Set[str]:
+        with self._cache_lock:
+            cached = self._users_cache.get(region)
+        if cached is not None and time.monotonic() - cached[0] < self._cache_ttl:
+            return set(cached[1])
+
+        client = self.clients[region]
+        parameter_not_found = self._parameter_not_found[region]
+        users: Set[str] = set()
         try:
-            response = self._client.get_parameter(
-                Name=self.cyhy_ops_key, WithDecryption=True
+            response = client.get_parameter(Name=self.cyhy_ops_key, WithDecryption=True)
+            # Filter out the empty strings produced by splitting an empty
+            # parameter value.
+            users = set(
+                filter(None, response.get("Parameter", {}).get("Value", "").split(","))
             )
-            users = response.get("Parameter", {}).get("Value", "").split(",")
-        except self._client.exceptions.ParameterNotFound:
-            logging.warning(
+            with self._cache_lock:
+                self._users_cache[region] = (time.monotonic(), set(users))
+                self._users_version[region] = response.get("Parameter", {}).get(
+                    "Version"
+                )
+        except parameter_not_found:
+            logger.warning(
                 'The CyHy Operators parameter "%s" does not exist in region "%s".',
                 self.cyhy_ops_key,
-                self.region,
+                region,
             )
         except ClientError as err:
-            logging.error(err)
+            logger.error(err)
 
         return users
 
-    def _update_cyhy_ops_users(self, user: str, remove: bool = False) -> int:
+    def _update_cyhy_ops_users(
+        self, region: str, user: str, remove: bool = False
+    ) -> int:
         """Update the list of CyHy Operators to use when an instance is built."""
-        users: List[str] = self._get_cyhy_ops_list()
-        update_msg: str = 'Performed no operations for "%s"'
+        update_msg: str
 
-        logging.debug("Current CyHy Operators: %s.", users)
+        users: Set[str] = self._get_cyhy_ops_list(region)
+
+        logger.debug("Current CyHy Operators: %s.", users)
 
         if remove:
             if user not in users:
-                logging.warning(
+                logger.warning(
                     'User "%s" is not in the list of active CyHy Operators in region "%s".',
                     user,
-                    self.region,
+                    region,
                 )
-            else:
-                users.remove(user)
-                update_msg = 'Removed "%s" from Cyhy Operators'
+                return 0
+            users.discard(user)
+            update_msg = 'Removed "%s" from Cyhy Operators in region "%s".'
         else:
             if user in users:
-                logging.warning(
+                logger.warning(
                     'User "%s" is already in the list of active CyHy Operators in region "%s".',
                     user,
-                    self.region,
+                    region,
                 )
-            else:
-                users.append(user)
-                update_msg = 'Added "%s" to Cyhy Operators'
+                return 0
+            users.add(user)
+            update_msg = 'Added "%s" to Cyhy Operators in region "%s".'
+
+        if self._store_cyhy_ops_users(region, users) != 0:
+            return 1
 
+        logger.info(update_msg, user, region)
+        return 0
+
+    def _store_cyhy_ops_users(self, region: str, users: Set[str]) -> int:
+        """Write the full CyHy Operators list for a region back to SSM.
+
+        Return 0 on success or 1 on error.  A write that raced with another
+        writer (detected via the parameter Version) is reported at error
+        level so the parameter can be re-checked, but still counts as a
+        success for this invocation's own change.
+        """
+        client = self.clients[region]
         updated_users = ",".join(sorted(users))
 
-        logging.debug('New CyHy Operators value: "%s".', updated_users)
+        with self._cache_lock:
+            expected_version = self._users_version.get(region)
+
+        logger.debug('New CyHy Operators value: "%s".', updated_users)
 
         try:
-            # The SSM response on success currently only contains a version
-            # number and the parameter tier.
-            # Neither are useful to us at this time, so we don't store them.
-            self._client.put_parameter(
+            # On success the SSM response contains the new parameter version
+            # and tier; the version lets us detect concurrent writers.
+            # The list of usernames is not a secret, and storing it as a
+            # StringList (the native SSM type for comma-separated values)
+            # avoids a KMS decryption on every read.
+            response = client.put_parameter(
                 Name=self.cyhy_ops_key,
                 Value=updated_users,
-                Type="SecureString",
+                Type="StringList",
                 Overwrite=True,
             )
-            log_msg = f'{update_msg} in region "%s".'
-            logging.info(log_msg, user, self.region)
+            new_version = response.get("Version")
+            # Write through to the cache so later reads see the new list.
+            with self._cache_lock:
+                self._users_cache[region] = (time.monotonic(), set(users))
+                self._users_version[region] = new_version
         except ClientError as err:
-            logging.error(
+            logger.error(
                 'Unable to update parameter "%s" in region "%s".',
                 self.cyhy_ops_key,
-                self.region,
+                region,
             )
-            logging.error(err)
+            logger.error(err)
             return 1
 
+        if (
+            expected_version is not None
+            and new_version is not None
+            and new_version != expected_version + 1
+        ):
+            # Another writer updated the parameter between our read and our
+            # write.  Our Overwrite=True put has already replaced their
+            # value, and the conflict is only visible after the fact, so the
+            # concurrent update cannot be recovered here — all we can do is
+            # say so loudly.
+            logger.error(
+                'Parameter "%s" in region "%s" was modified concurrently and the '
+                "concurrent update may have been overwritten; please re-check the "
+                "parameter value.",
+                self.cyhy_ops_key,
+                region,
+            )
+
         return 0
 
-    def add_user(self, user: str, ssh_key: str, overwrite: bool = False) -> int:
-        """Add an Operator to the Parameter Store."""
-        # Should this be atomic?
+    def _put_ssh_key(
+        self, region: str, user: str, ssh_key: str, overwrite: bool
+    ) -> Optional[bool]:
+        """Store a user's SSH key in a region.
+
+        Return True if the key was written, False if it already exists and
+        overwriting was not requested, or None on error.
+        """
+        client = self.clients[region]
+        key_name = f"{self.ssh_key_prefix}/{user}"
+        parameter_not_found = self._parameter_not_found[region]
+        parameter_already_exists = self._parameter_already_exists[region]
+
+        if len(ssh_key.encode()) > STANDARD_TIER_MAX_BYTES:
+            # Reject oversized values before any network traffic; SSM would
+            # refuse them anyway once they exceed the Standard tier limit.
+            logger.error(
+                'SSH key for "%s" exceeds the %d byte Standard tier parameter limit.',
+                user,
+                STANDARD_TIER_MAX_BYTES,
+            )
+            return None
+
+        # Reads are far cheaper than writes (PutParameter has the tightest
+        # SSM throughput quota and creates a new parameter version every
+        # time), so check whether the stored key already matches before
+        # paying for a write.
+        existing_value: Optional[str] = None
+        try:
+            existing = client.get_parameter(Name=key_name, WithDecryption=True)
+            existing_value = existing.get("Parameter", {}).get("Value")
+        except parameter_not_found:
+            pass
+        except ClientError as err:
+            logger.error(err)
+            return None
+
+        if existing_value == ssh_key:
+            logger.info(
+                'SSH key for "%s" is already up to date in the Parameter Store in region "%s"; skipping write.',
+                user,
+                region,
+            )
+            return False
+
+        if existing_value is not None and not overwrite:
+            logger.warning(
+                'SSH key for "%s" already exists in the Parameter Store in region "%s".',
+                user,
+                region,
+            )
+            logger.warning(
+                'If you need to overwrite this value, please use the "--overwrite" switch.'
+            )
+            return False
+
         try:
             # The SSM response on success currently only contains a version
             # number and the parameter tier.
             # Neither are useful to us at this time, so we don't store them.
-            logging.debug(
-                'Adding SSH key "%s/%s" to the Parameter Store in region "%s".',
-                self.ssh_key_prefix,
-                user,
-                self.region,
+            logger.debug(
+                'Adding SSH key "%s" to the Parameter Store in region "%s".',
+                key_name,
+                region,
             )
-            self._client.put_parameter(
-                Name=f"{self.ssh_key_prefix}/{user}",
+            client.put_parameter(
+                Name=key_name,
                 Value=ssh_key,
+                Tier="Standard",
                 Type="SecureString",
                 Overwrite=overwrite,
             )
-            logging.info(
+            logger.info(
                 'Added "%s"\'s SSH key to the Parameter Store in "%s".',
                 user,
-                self.region,
+                region,
             )
-        except self._client.exceptions.ParameterAlreadyExists:
-            logging.warning(
+        except parameter_already_exists:
+            logger.warning(
                 'SSH key for "%s" already exists in the Parameter Store in region "%s".',
                 user,
-                self.region,
+                region,
             )
-            logging.warning(
+            logger.warning(
                 'If you need to overwrite this value, please use the "--overwrite" switch.'
             )
+            return False
         except ClientError as err:
-            logging.error(err)
+            logger.error(err)
+            return None
+
+        return True
+
+    def _add_user_region(
+        self, region: str, user: str, ssh_key: str, overwrite: bool
+    ) -> int:
+        # Should this be atomic?
+        # The SSH key write and the operators list read touch independent
+        # parameters, so overlap them; the read also warms the operators
+        # cache, letting _update_cyhy_ops_users below skip its own read.
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            stored_future = executor.submit(
+                self._put_ssh_key, region, user, ssh_key, overwrite
+            )
+            users_future = executor.submit(self._get_cyhy_ops_list, region)
+            stored = stored_future.result()
+            users = users_future.result()
+        if stored is None:
             return 1
 
-        return self._update_cyhy_ops_users(user)
+        if not stored and user in users:
+            # An idempotent re-add: the SSH key is already stored and the user
+            # is already an active Operator, so there is nothing to write.
+            return 0
 
-    def remove_user(self, user: str, full: bool = False) -> int:
-        """Remove an Operator from the Parameter Store."""
+        return self._update_cyhy_ops_users(region, user)
+
+    def add_user(self, user: str, ssh_key: str, overwrite: bool = False) -> int:
+        """Add an Operator to the Parameter Store in every region."""
+        return self._fan_out(
+            lambda region: self._add_user_region(region, user, ssh_key, overwrite)
+        )
+
+    def _add_users_region(
+        self, region: str, pairs: List[Tuple[str, str]], overwrite: bool
+    ) -> int:
+        status = 0
+        new_users: Set[str] = set()
+
+        # The individual SSH key puts are independent of one another, so
+        # overlap them instead of paying one round trip per key.  The worker
+        # bound keeps us well under SSM's PutParameter throughput limit.
+        with ThreadPoolExecutor(max_workers=min(8, max(1, len(pairs)))) as executor:
+            stored = executor.map(
+                lambda pair: self._put_ssh_key(region, pair[0], pair[1], overwrite),
+                pairs,
+            )
+            for (user, _), key_result in zip(pairs, stored):
+                if key_result is None:
+                    status = 1
+                    continue
+                new_users.add(user)
+
+        # A single list write covers every user added above.
+        users = self._get_cyhy_ops_list(region)
+        updated_users = users | new_users
+        if updated_users != users:
+            if self._store_cyhy_ops_users(region, updated_users) != 0:
+                return 1
+            logger.info(
+                'Added %d user(s) to Cyhy Operators in region "%s".',
+                len(updated_users - users),
+                region,
+            )
+
+        return status
+
+    def add_users(self, pairs: List[Tuple[str, str]], overwrite: bool = False) -> int:
+        """Add multiple Operators to the Parameter Store in every region.
+
+        Each region reads and writes the CyHy Operators list once no matter
+        how many users are being added.
+        """
+        return self._fan_out(
+            lambda region: self._add_users_region(region, pairs, overwrite)
+        )
+
+    def _remove_user_region(self, region: str, user: str, full: bool) -> int:
+        client = self.clients[region]
+        parameter_not_found = self._parameter_not_found[region]
         # Should this be atomic?
         if full:
             try:
                 parameter_name = f"{self.ssh_key_prefix}/{user}"
                 # Response is an empty dictionary on success.
-                self._client.delete_parameter(Name=parameter_name)
-                logging.info(
+                client.delete_parameter(Name=parameter_name)
+                logger.info(
                     'Removed SSH key for "%s" from the Parameter Store in region "%s".',
                     user,
-                    self.region,
+                    region,
                 )
-            except self._client.exceptions.ParameterNotFound:
-                logging.warning(
+            except parameter_not_found:
+                logger.warning(
                     'SSH key for "%s" does not exist in the Parameter Store in region "%s".',
                     user,
-                    self.region,
+                    region,
                 )
             except ClientError as err:
-                logging.error(err)
+                logger.error(err)
                 return 1
 
-        return self._update_cyhy_ops_users(user, remove=True)
+        return self._update_cyhy_ops_users(region, user, remove=True)
+
+    def remove_user(self, user: str, full: bool = False) -> int:
+        """Remove an Operator from the Parameter Store in every region."""
+        return self._fan_out(
+            lambda region: self._remove_user_region(region, user, full)
+        )
+
+    def _check_user_region(
+        self, region: str, user: str, exists_only: bool = False
+    ) -> int:
+        client = self.clients[region]
+        ssh_key_name = f"{self.ssh_key_prefix}/{user}"
+
+        if exists_only:
+            try:
+                # Without WithDecryption SSM skips the server-side KMS
+                # decryption, so an existence probe is cheaper than a full
+                # read.
+                response = client.get_parameters(Names=[ssh_key_name])
+            except ClientError as err:
+                logger.error(err)
+                return 1
+
+            logger.info(
+                'User "%s" does%s have an SSH key in the Parameter Store of region "%s".',
+                user,
+                "" if response.get("Parameters") else " not",
+                region,
+            )
+            return 0
 
-    def check_user(self, user: str) -> int:
-        """Check for the existence of an Operator and return information."""
         try:
-            response = self._client.get_parameter(
-                Name=f"{self.ssh_key_prefix}/{user}", WithDecryption=True
+            # GetParameters lets us retrieve the user's SSH key and the list
+            # of active CyHy Operators in a single round trip instead of two.
+            response = client.get_parameters(
+                Names=[ssh_key_name, self.cyhy_ops_key], WithDecryption=True
             )
-            logging.info(
+        except ClientError as err:
+            logger.error(err)
+            return 1
+
+        parameters = {
+            parameter["Name"]: parameter for parameter in response.get("Parameters", [])
+        }
+
+        if ssh_key_name in parameters:
+            logger.info(
                 'User "%s" has the following SSH key in the Parameter Store of region "%s":',
                 user,
-                self.region,
+                region,
             )
-            logging.info(response["Parameter"]["Value"])
-        except self._client.exceptions.ParameterNotFound:
-            logging.info(
+            logger.info(parameters[ssh_key_name]["Value"])
+        else:
+            logger.info(
                 'User "%s" does not have an SSH key in the Parameter Store of region "%s".',
                 user,
-                self.region,
+                region,
             )
-        except ClientError as err:
-            logging.error(err)
-            return 1
 
-        enabled_users: List[str] = self._get_cyhy_ops_list()
-        if not enabled_users:
+        if self.cyhy_ops_key not in parameters:
+            logger.warning(
+                'The CyHy Operators parameter "%s" does not exist in region "%s".',
+                self.cyhy_ops_key,
+                region,
+            )
             return 1
 
-        log_msg = (
-            'User "%s" is '
-            + ("" if user in enabled_users else "not ")
-            + 'set as a CyHy Operator in region "%s".'
+        ops_parameter = parameters[self.cyhy_ops_key]
+        enabled_users: Set[str] = set(
+            filter(None, ops_parameter.get("Value", "").split(","))
+        )
+        # We already paid for the read, so seed the operators cache with it
+        # for any follow-up operations in this region.
+        with self._cache_lock:
+            self._users_cache[region] = (time.monotonic(), set(enabled_users))
+            self._users_version[region] = ops_parameter.get("Version")
+
+        logger.info(
+            'User "%s" is %sset as a CyHy Operator in region "%s".',
+            user,
+            "" if user in enabled_users else "not ",
+            region,
         )
-        logging.info(log_msg, user, self.region)
 
         return 0
+
+    def check_user(self, user: str, exists_only: bool = False) -> int:
+        """Check for the existence of an Operator and return information.
+
+        When exists_only is True, only probe for the user's SSH key instead
+        of retrieving and decrypting the stored values.
+        """
+        return self._fan_out(
+            lambda region: self._check_user_region(region, user, exists_only)
+        )
+
+
+@functools.lru_cache(maxsize=8)
+def get_manager(
+    regions: Tuple[str, ...], cyhy_ops_key: str, ssh_key_prefix: str
+) -> ManageOperators:
+    """Return a memoized ManageOperators for the given configuration.
+
+    Long-lived callers issuing several operations get back the same manager
+    (and therefore the same caches and clients) instead of rebuilding one per
+    subcommand.  The regions must be passed as a tuple so they are hashable.
+    """
+    return ManageOperators(list(regions), cyhy_ops_key, ssh_key_prefix)
@@ -2,6 +2,7 @@
 
 # Standard Python Libraries
 import os
+from pathlib import Path
 import sys
 from unittest.mock import patch
 
@@ -52,3 +53,21 @@ def test_release_version():
     assert (
         RELEASE_TAG == f"v{PROJECT_VERSION}"
     ), "RELEASE_TAG does not match the project version."
+
+
+def test_no_get_parameters_by_path():
+    """Verify that the throughput-limited GetParametersByPath API is not used.
+
+    GetParametersByPath has a far lower account-level TPS quota than
+    GetParameter(s), so it must never creep into the common lookup paths.
+    Any intentional bulk-export call site must carry a "# bulk-ok" tag on the
+    same line.
+    """
+    package_dir = Path(manage_cyhy_ops.__file__).parent
+    for source_file in package_dir.glob("*.py"):
+        lines = source_file.read_text().splitlines()
+        for line_number, line in enumerate(lines, start=1):
+            assert "get_parameters_by_path" not in line or "# bulk-ok" in line, (
+                f"{source_file.name}:{line_number} uses get_parameters_by_path "
+                'without a "# bulk-ok" tag'
+            )